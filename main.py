@@ -1,12 +1,29 @@
 import os
 from dotenv import load_dotenv
 import google.generativeai as genai
+import aiofiles
+import aiohttp
 import argparse
+import asyncio
+import functools
+import hashlib
 import logging
+import random
+import re
+import time
+
+from meowdoc import cache, fastio
 import pathlib
 import fnmatch
+import shutil
 import subprocess
 import yaml
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
 
 # Configure logging
 logging.basicConfig(
@@ -19,8 +36,142 @@ load_dotenv()
 # Set your API key
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
+GEMINI_API_URL = (
+    "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+)
+
+BATCH_TOKEN_BUDGET = 8000
+
+# Only files with these extensions are sent to the LLM; everything else
+# (binaries, lockfiles, images, logs) is skipped before being read.
+SOURCE_EXTS = {
+    ".py",
+    ".js",
+    ".ts",
+    ".jsx",
+    ".tsx",
+    ".rs",
+    ".go",
+    ".java",
+    ".c",
+    ".h",
+    ".cpp",
+    ".hpp",
+    ".rb",
+    ".sh",
+}
+
+# Skip files larger than this; they would blow past the model context anyway.
+MAX_FILE_BYTES = 200 * 1024
+
+# Bump whenever the prompt wording changes, so stale cached responses are not reused.
+PROMPT_TEMPLATE_VERSION = "1"
+
+_FILE_DELIMITER_RE = re.compile(r"^--- FILE: (.+?) ---$", re.MULTILINE)
+
+# GenerativeModel instances hold the underlying transport channel; reuse them
+# across calls instead of paying connection setup per file.
+_MODEL_CACHE = {}
+
+MAX_RETRIES = 6
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with jitter, capped at 30 seconds."""
+    return min(2**attempt + random.uniform(0, 1), 30)
+
+
+async def _call_gemini(session, prompt, model):
+    """POSTs one generateContent request, retrying transient failures with
+    exponential backoff and jitter. Honors Retry-After on rate limits."""
+    for attempt in range(MAX_RETRIES):
+        delay = _backoff_delay(attempt)
+        try:
+            async with session.post(
+                GEMINI_API_URL.format(model=model),
+                params={"key": os.getenv("GOOGLE_API_KEY")},
+                json={"contents": [{"parts": [{"text": prompt}]}]},
+            ) as response:
+                if response.status == 429 and "Retry-After" in response.headers:
+                    delay = float(response.headers["Retry-After"])
+                response.raise_for_status()
+                payload = await response.json()
+            return payload["candidates"][0]["content"]["parts"][0]["text"]
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            logging.warning(
+                f"Gemini call failed (attempt {attempt + 1}/{MAX_RETRIES}), "
+                f"retrying in {delay:.1f}s: {e}"
+            )
+            await asyncio.sleep(delay)
+
+
+_PROMPT_HEAD = """
+    Generate comprehensive documentation in Markdown format for the following Python file:
+
+    ```python
+    """
+
+_PROMPT_TAIL = """
+    ```
+
+    Include:
+
+    *   A concise module-level description (if present).
+    *   Descriptions of each function and class, including parameters, return values, and docstrings.
+    *   Use clear headings and subheadings (e.g., ##, ###).
+    *   Provide example usage where possible.
+    *   If there are no docstrings, try to infer the purpose of the code based on its structure and variable names.
+    """
+
+# Fixed prompt overhead in estimated tokens, for batch budget accounting.
+PROMPT_OVERHEAD_TOKENS = (len(_PROMPT_HEAD) + len(_PROMPT_TAIL)) // 4
 
-def generate_docs(filepath, output_path, model="gemini-pro"):
+
+def build_prompt(code):
+    """Builds the documentation prompt for a single file's code."""
+    return "".join((_PROMPT_HEAD, code, _PROMPT_TAIL))
+
+
+def cache_key(model, code):
+    """Cache key for an LLM response: model + prompt template version + code."""
+    return hashlib.sha256(
+        (model + PROMPT_TEMPLATE_VERSION + code).encode("utf-8")
+    ).hexdigest()
+
+
+def write_docs(output_path, docs):
+    """Writes generated Markdown to output_path, creating parent directories."""
+    try:
+        pathlib.Path(os.path.dirname(output_path)).mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as outfile:
+            outfile.write(docs)
+        logging.info(f"Documentation written to: {output_path}")
+        return output_path
+    except Exception as e:
+        logging.exception(f"Error writing to output file: {e}")
+        return None
+
+
+async def write_docs_async(output_path, docs):
+    """Async variant of write_docs that keeps the event loop unblocked."""
+    try:
+        await asyncio.to_thread(
+            pathlib.Path(os.path.dirname(output_path)).mkdir,
+            parents=True,
+            exist_ok=True,
+        )
+        async with aiofiles.open(output_path, "w", encoding="utf-8") as outfile:
+            await outfile.write(docs)
+        logging.info(f"Documentation written to: {output_path}")
+        return output_path
+    except Exception as e:
+        logging.exception(f"Error writing to output file: {e}")
+        return None
+
+
+def generate_docs(filepath, output_path, model="gemini-pro", use_cache=True):
     """Generates documentation for a Python file using Gemini."""
     logging.info(f"Generating docs for: {filepath} -> {output_path}")
     try:
@@ -33,102 +184,395 @@ def generate_docs(filepath, output_path, model="gemini-pro"):
         logging.exception(f"Error reading file: {e}")
         return None
 
-    prompt = f"""
-    Generate comprehensive documentation in Markdown format for the following Python file:
+    key = cache_key(model, code)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            logging.info(f"Cache hit for: {filepath}")
+            return write_docs(output_path, cached)
 
-    ```python
-    {code}
-    ```
+    prompt = build_prompt(code)
+
+    model_obj = _MODEL_CACHE.setdefault(
+        model, genai.GenerativeModel(model_name=model)
+    )
+    for attempt in range(MAX_RETRIES):
+        try:
+            # Stream chunks straight to disk instead of buffering the whole
+            # response; pieces are only accumulated when the cache needs them.
+            response = model_obj.generate_content(prompt, stream=True)
+            pathlib.Path(os.path.dirname(output_path)).mkdir(
+                parents=True, exist_ok=True
+            )
+            pieces = []
+            with open(output_path, "w", encoding="utf-8") as outfile:
+                for chunk in response:
+                    outfile.write(chunk.text)
+                    if use_cache:
+                        pieces.append(chunk.text)
+            logging.info(f"Documentation written to: {output_path}")
+            if use_cache:
+                cache.put(key, "".join(pieces))
+            return output_path
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1:
+                logging.exception(f"Error calling Gemini API: {e}")
+                # Don't leave the last attempt's partially-streamed page
+                # behind; it is untracked in nav but mkdocs would render it.
+                try:
+                    os.remove(output_path)
+                except OSError:
+                    pass
+                return None
+            delay = _backoff_delay(attempt)
+            logging.warning(
+                f"Gemini call failed (attempt {attempt + 1}/{MAX_RETRIES}), "
+                f"retrying in {delay:.1f}s: {e}"
+            )
+            time.sleep(delay)
 
-    Include:
+
+async def generate_docs_async(
+    session, filepath, output_path, model="gemini-pro", use_cache=True
+):
+    """Generates documentation for a Python file via the Gemini REST API."""
+    logging.info(f"Generating docs for: {filepath} -> {output_path}")
+    try:
+        async with aiofiles.open(filepath, "r", encoding="utf-8") as f:
+            code = await f.read()
+    except FileNotFoundError:
+        logging.error(f"File not found: {filepath}")
+        return None
+    except Exception as e:
+        logging.exception(f"Error reading file: {e}")
+        return None
+
+    key = cache_key(model, code)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            logging.info(f"Cache hit for: {filepath}")
+            return await write_docs_async(output_path, cached)
+
+    prompt = build_prompt(code)
+
+    try:
+        docs = await _call_gemini(session, prompt, model)
+    except Exception as e:
+        logging.exception(f"Error calling Gemini API: {e}")
+        return None
+
+    if use_cache:
+        cache.put(key, docs)
+    return await write_docs_async(output_path, docs)
+
+
+def estimate_tokens(code):
+    """Crude token estimate (~4 characters per token)."""
+    return len(code) // 4
+
+
+def _read_source(task):
+    """Reads one (filepath, output_path) task; returns a
+    (filepath, output_path, code) triple, or None on read failure."""
+    filepath, output_path = task
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            code = f.read()
+    except Exception as e:
+        logging.exception(f"Error reading file: {e}")
+        return None
+    return (filepath, output_path, code)
+
+
+def read_sources(tasks):
+    """Reads all source files, submitting the whole batch through io_uring
+    where available and spreading the I/O across cores otherwise."""
+    if fastio.has_uring() and len(tasks) >= 2:
+        contents = fastio.bulk_read([filepath for filepath, _ in tasks])
+        sources = []
+        for filepath, output_path in tasks:
+            data = contents.get(filepath)
+            if data is None:
+                continue
+            try:
+                sources.append((filepath, output_path, data.decode("utf-8")))
+            except UnicodeDecodeError as e:
+                logging.error(f"Error decoding file {filepath}: {e}")
+        return sources
+
+    if len(tasks) < 2:
+        results = map(_read_source, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            results = list(pool.map(_read_source, tasks))
+    return [source for source in results if source is not None]
+
+
+def pack_batches(sources, max_tokens=BATCH_TOKEN_BUDGET):
+    """Greedily packs (filepath, output_path, code) triples into batches
+    bounded by an estimated token budget, after reserving room for the
+    fixed prompt template around the code."""
+    budget = max(1, max_tokens - PROMPT_OVERHEAD_TOKENS)
+    batches = []
+    current = []
+    current_tokens = 0
+    for filepath, output_path, code in sources:
+        tokens = estimate_tokens(code)
+        if current and current_tokens + tokens > budget:
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append((filepath, output_path, code))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(batch):
+    """Builds one prompt covering several files, delimited by `--- FILE: path ---`."""
+    prompt = """
+    Generate comprehensive documentation in Markdown format for each of the following files.
+    Start the documentation for every file with a line of exactly the form `--- FILE: <path> ---`
+    (using the same path as given below), followed by that file's Markdown documentation.
+
+    Include for each file:
 
     *   A concise module-level description (if present).
     *   Descriptions of each function and class, including parameters, return values, and docstrings.
     *   Use clear headings and subheadings (e.g., ##, ###).
     *   Provide example usage where possible.
     *   If there are no docstrings, try to infer the purpose of the code based on its structure and variable names.
+
     """
+    for filepath, _, code in batch:
+        prompt += f"--- FILE: {filepath} ---\n```python\n{code}\n```\n\n"
+    return prompt
+
+
+def split_batch_response(docs):
+    """Splits a batched response back into a {path: markdown} map."""
+    sections = _FILE_DELIMITER_RE.split(docs)
+    # sections = [preamble, path1, md1, path2, md2, ...]
+    return {
+        sections[i].strip(): sections[i + 1].strip()
+        for i in range(1, len(sections) - 1, 2)
+    }
+
+
+async def generate_docs_batch_async(session, batch, model="gemini-pro", use_cache=True):
+    """Generates docs for a batch of files in a single Gemini call, falling
+    back to per-file calls for any file missing from the parsed response."""
+    generated = []
+    if use_cache:
+        remaining = []
+        for filepath, output_path, code in batch:
+            cached = cache.get(cache_key(model, code))
+            if cached is not None:
+                logging.info(f"Cache hit for: {filepath}")
+                path = await write_docs_async(output_path, cached)
+                if path:
+                    generated.append(path)
+            else:
+                remaining.append((filepath, output_path, code))
+        batch = remaining
+        if not batch:
+            return generated
+
+    if len(batch) == 1:
+        filepath, output_path, _ = batch[0]
+        result = await generate_docs_async(
+            session, filepath, output_path, model, use_cache
+        )
+        return generated + ([result] if result else [])
 
-    try:
-        model = genai.GenerativeModel(model_name=model)
-        response = model.generate_content(prompt)
-        docs = response.text
-    except Exception as e:
-        logging.exception(f"Error calling Gemini API: {e}")
-        return None
+    logging.info(f"Generating docs for batch of {len(batch)} files")
+    prompt = build_batch_prompt(batch)
 
+    docs_by_path = {}
     try:
-        pathlib.Path(os.path.dirname(output_path)).mkdir(parents=True, exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as outfile:
-            outfile.write(docs)
-        logging.info(f"Documentation written to: {output_path}")
-        return output_path
+        docs = await _call_gemini(session, prompt, model)
+        docs_by_path = split_batch_response(docs)
     except Exception as e:
-        logging.exception(f"Error writing to output file: {e}")
+        logging.exception(f"Error calling Gemini API for batch: {e}")
+
+    fallback = []
+    for filepath, output_path, code in batch:
+        docs = docs_by_path.get(filepath)
+        if not docs:
+            fallback.append((filepath, output_path))
+            continue
+        if use_cache:
+            cache.put(cache_key(model, code), docs)
+        path = await write_docs_async(output_path, docs)
+        if path:
+            generated.append(path)
+
+    if fallback:
+        logging.warning(
+            f"Falling back to per-file calls for {len(fallback)} files missing from batch response"
+        )
+        results = await asyncio.gather(
+            *[
+                generate_docs_async(session, filepath, output_path, model, use_cache)
+                for filepath, output_path in fallback
+            ]
+        )
+        generated.extend(path for path in results if path)
+    return generated
+
+
+def dedupe_sources(sources):
+    """Collapses byte-identical files to one representative each.
+
+    Returns (unique_sources, duplicate_outputs) where duplicate_outputs maps a
+    representative's output path to the output paths of its duplicates."""
+    by_hash = {}
+    unique_sources = []
+    duplicate_outputs = {}
+    for filepath, output_path, code in sources:
+        digest = hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+        if digest in by_hash:
+            rep_output = by_hash[digest]
+            logging.info(f"Skipping {filepath} (identical to an earlier file)")
+            duplicate_outputs.setdefault(rep_output, []).append(output_path)
+        else:
+            by_hash[digest] = output_path
+            unique_sources.append((filepath, output_path, code))
+    return unique_sources, duplicate_outputs
+
+
+async def generate_all(tasks, model, max_concurrency, use_cache=True):
+    """Dispatches all (filepath, output_path) tasks concurrently over one session,
+    batching small files into shared prompts. Identical files are documented
+    once and the result fanned out to every output path."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    sources, duplicate_outputs = dedupe_sources(read_sources(tasks))
+    batches = pack_batches(sources)
+
+    async def bounded(batch):
+        async with semaphore:
+            return await generate_docs_batch_async(session, batch, model, use_cache)
+
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(*[bounded(batch) for batch in batches])
+    generated = [path for batch_paths in results for path in batch_paths]
+
+    for path in list(generated):
+        for dup_path in duplicate_outputs.get(path, ()):
+            try:
+                pathlib.Path(os.path.dirname(dup_path)).mkdir(
+                    parents=True, exist_ok=True
+                )
+                shutil.copyfile(path, dup_path)
+                logging.info(f"Documentation copied to: {dup_path}")
+                generated.append(dup_path)
+            except Exception as e:
+                logging.exception(f"Error copying docs to {dup_path}: {e}")
+    return generated
+
+
+@functools.lru_cache(maxsize=None)
+def _abs(path):
+    """Memoized os.path.abspath; path normalization is surprisingly hot on
+    large trees (and on network filesystems where CWD resolution is slow)."""
+    return os.path.abspath(path)
+
+
+def _compile_ignore(patterns):
+    """Compiles glob ignore patterns into a single alternation regex."""
+    if not patterns:
         return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
 
 
-def should_ignore(path, ignore_patterns):
-    """Checks if a path or any of its parent directories should be ignored."""
-    path = os.path.abspath(path)  # Convert to absolute path for consistent comparison
-    while path:
-        base_name = os.path.basename(path)
-        for pattern in ignore_patterns:
-            if fnmatch.fnmatch(base_name, pattern):
-                logging.info(f"Ignoring {path} because it matches pattern: {pattern}")
-                return True
-        path = os.path.dirname(path)  # Move up to the parent directory
-        if path == os.path.dirname(path):  # check for root
-            break
+def should_ignore(path, ignore_re):
+    """Checks if any component of the path matches the compiled ignore regex."""
+    if ignore_re is None:
+        return False
+    parts = _abs(path).split(os.sep)
+    if any(ignore_re.fullmatch(part) for part in parts):
+        logging.info(f"Ignoring {path} because it matches an ignore pattern")
+        return True
     return False
 
 
-def process_path(input_path, mkdocs_dir, docs_dir_name, model, ignore_patterns=None):
-    """Processes a single file or directory, ignoring specified patterns and the docs directory."""
+def is_doc_candidate(filepath, extensions=SOURCE_EXTS, max_bytes=MAX_FILE_BYTES):
+    """Cheap pre-filter: accept only whitelisted source extensions and files
+    small enough to fit a prompt, without reading the file."""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext not in extensions:
+        logging.info(f"Skipping non-source file: {filepath}")
+        return False
+    try:
+        if os.path.getsize(filepath) > max_bytes:
+            logging.info(f"Skipping oversized file: {filepath}")
+            return False
+    except OSError as e:
+        logging.error(f"Error statting file {filepath}: {e}")
+        return False
+    return True
+
+
+def process_path(
+    input_path,
+    mkdocs_dir,
+    docs_dir_name,
+    ignore_re=None,
+    extensions=SOURCE_EXTS,
+    max_bytes=MAX_FILE_BYTES,
+):
+    """Collects (filepath, output_path) tasks for a file or directory,
+    ignoring specified patterns and the docs directory."""
     logging.info(f"Processing path: {input_path}")
-    generated_files = []
+    tasks = []
 
-    if ignore_patterns is None:
-        ignore_patterns = []
-
-    if should_ignore(input_path, ignore_patterns):
+    if should_ignore(input_path, ignore_re):
         logging.info(f"Ignoring path (matches pattern): {input_path}")
         return []
 
-    if os.path.abspath(input_path) == os.path.abspath(mkdocs_dir):
+    if _abs(input_path) == _abs(mkdocs_dir):
         logging.info(f"Ignoring the mkdocs directory: {input_path}")
         return []
 
     docs_dir = os.path.join(mkdocs_dir, docs_dir_name)
+    abs_docs_dir = _abs(docs_dir)
 
     if os.path.isfile(input_path):
         logging.info(f"Input is a file: {input_path}")
+        if not is_doc_candidate(input_path, extensions, max_bytes):
+            return []
         output_filename = os.path.splitext(os.path.basename(input_path))[0] + ".md"
         output_path = os.path.join(docs_dir, output_filename)
-        doc_path = generate_docs(input_path, output_path, model)
-        if doc_path:
-            generated_files.append(doc_path)
+        tasks.append((input_path, output_path))
     elif os.path.isdir(input_path):
         logging.info(f"Input is a directory: {input_path}")
-        for item in os.listdir(input_path):
-            item_path = os.path.join(input_path, item)
-            if not should_ignore(item_path, ignore_patterns) and not os.path.samefile(
-                item_path, docs_dir
-            ):
-                generated_files.extend(
-                    process_path(
-                        item_path, mkdocs_dir, docs_dir_name, model, ignore_patterns
+        for root, dirs, files in os.walk(input_path):
+            # Prune ignored directories and the docs directory in place so
+            # os.walk never descends into them.
+            dirs[:] = [
+                d
+                for d in dirs
+                if not (ignore_re and ignore_re.fullmatch(d))
+                and _abs(os.path.join(root, d)) != abs_docs_dir
+            ]
+            for fname in files:
+                if ignore_re and ignore_re.fullmatch(fname):
+                    logging.info(
+                        f"Ignoring item within directory (matches pattern): "
+                        f"{os.path.join(root, fname)}"
                     )
-                )
-            elif os.path.samefile(item_path, docs_dir):
-                logging.info(f"Ignoring the docs directory: {item_path}")
-            else:
-                logging.info(
-                    f"Ignoring item within directory (matches pattern): {item_path}"
-                )
+                    continue
+                filepath = os.path.join(root, fname)
+                if not is_doc_candidate(filepath, extensions, max_bytes):
+                    continue
+                output_filename = os.path.splitext(fname)[0] + ".md"
+                output_path = os.path.join(docs_dir, output_filename)
+                tasks.append((filepath, output_path))
     else:
         logging.warning(f"Skipping invalid path: {input_path}")
-    return generated_files
+    return tasks
 
 
 def update_mkdocs_nav(generated_files, is_input_dir, mkdocs_dir, docs_dir_name):
@@ -137,7 +581,7 @@ def update_mkdocs_nav(generated_files, is_input_dir, mkdocs_dir, docs_dir_name):
 
     try:
         with open(mkdocs_config_path, "r") as f:
-            mkdocs_config = yaml.safe_load(f)
+            mkdocs_config = yaml.load(f, Loader=_YamlLoader)
     except FileNotFoundError:
         logging.error(f"mkdocs.yml not found. Please create a mkdocs project first.")
         return
@@ -163,14 +607,25 @@ def update_mkdocs_nav(generated_files, is_input_dir, mkdocs_dir, docs_dir_name):
         else:
             api_section = item["API"]
 
+        # Only flat (name, path) entries can ever match what this loop
+        # appends; nested subsections carry list values, which are
+        # unhashable anyway, so skip them when seeding the seen set.
+        seen = {
+            (k, v)
+            for d in api_section
+            if isinstance(d, dict) and d
+            for k, v in [next(iter(d.items()))]
+            if isinstance(v, str)
+        }
         for file in generated_files:
             filename = os.path.splitext(os.path.basename(file))[0]
             relative_path = os.path.relpath(
                 file, os.path.join(mkdocs_dir, docs_dir_name)
             )
-            nav_entry = {filename: relative_path}
-            if nav_entry not in api_section:
-                api_section.append(nav_entry)
+            entry = (filename, relative_path)
+            if entry not in seen:
+                api_section.append({filename: relative_path})
+                seen.add(entry)
 
     else:  # single file
         file = generated_files[0]
@@ -182,7 +637,14 @@ def update_mkdocs_nav(generated_files, is_input_dir, mkdocs_dir, docs_dir_name):
 
     try:
         with open(mkdocs_config_path, "w") as f:
-            yaml.dump(mkdocs_config, f, indent=2)  # Use indent for better formatting
+            yaml.dump(
+                mkdocs_config,
+                f,
+                Dumper=_YamlDumper,
+                sort_keys=False,
+                default_flow_style=False,
+                indent=2,
+            )
         logging.info("mkdocs.yml updated")
     except Exception as e:
         logging.error(f"Error writing to mkdocs.yml: {e}")
@@ -202,10 +664,16 @@ def create_mkdocs_project(project_dir, docs_dir_name):
             )
             # Add a default nav to the created mkdocs.yml
             with open(mkdocs_config_path, "r") as f:
-                mkdocs_config = yaml.safe_load(f)
+                mkdocs_config = yaml.load(f, Loader=_YamlLoader)
             mkdocs_config["nav"] = [{"Home": "index.md"}]
             with open(mkdocs_config_path, "w") as f:
-                yaml.dump(mkdocs_config, f)
+                yaml.dump(
+                    mkdocs_config,
+                    f,
+                    Dumper=_YamlDumper,
+                    sort_keys=False,
+                    default_flow_style=False,
+                )
         except subprocess.CalledProcessError as e:
             logging.error(f"Failed to create MkDocs project: {e}")
             logging.error(f"Stdout: {e.stdout}")
@@ -249,6 +717,29 @@ def main():
     parser.add_argument(
         "--interactive", help="Run in interactive mode", action="store_true"
     )
+    parser.add_argument(
+        "--max-concurrency",
+        help="Maximum number of concurrent LLM calls (default: 10)",
+        type=int,
+        default=10,
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="Bypass the on-disk LLM response cache",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--extensions",
+        nargs="+",
+        help="Source file extensions to document (e.g., .py .rs).",
+        default=sorted(SOURCE_EXTS),
+    )
+    parser.add_argument(
+        "--max-file-size",
+        help=f"Skip files larger than this many bytes (default: {MAX_FILE_BYTES})",
+        type=int,
+        default=MAX_FILE_BYTES,
+    )
     parser.add_argument(
         "--ignore",
         nargs="+",
@@ -306,12 +797,17 @@ def main():
 
     docs_dir = os.path.join(args.mkdocs_dir, args.docs_dir_name)
     is_input_dir = os.path.isdir(args.input_path)
-    generated_files = process_path(
+    ignore_re = _compile_ignore(args.ignore)
+    tasks = process_path(
         args.input_path,
         args.mkdocs_dir,
         args.docs_dir_name,
-        args.model,
-        args.ignore,
+        ignore_re,
+        {ext.lower() for ext in args.extensions},
+        args.max_file_size,
+    )
+    generated_files = asyncio.run(
+        generate_all(tasks, args.model, args.max_concurrency, not args.no_cache)
     )
 
     if generated_files:
@@ -0,0 +1,49 @@
+import logging
+import os
+import sqlite3
+import time
+
+DEFAULT_DB_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "meowdoc", "responses.db"
+)
+
+
+def _connect(db_path):
+    """Opens the cache database, creating it (and its table) if needed."""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, md BLOB, ts INTEGER)"
+    )
+    return conn
+
+
+def get(key, db_path=DEFAULT_DB_PATH):
+    """Returns the cached Markdown for a key, or None on a miss."""
+    try:
+        conn = _connect(db_path)
+        row = conn.execute(
+            "SELECT md FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        conn.close()
+    except sqlite3.Error as e:
+        logging.error(f"Error reading from response cache: {e}")
+        return None
+    if row is None:
+        return None
+    md = row[0]
+    return md.decode("utf-8") if isinstance(md, bytes) else md
+
+
+def put(key, md, db_path=DEFAULT_DB_PATH):
+    """Stores Markdown for a key, overwriting any previous entry."""
+    try:
+        conn = _connect(db_path)
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, md, ts) VALUES (?, ?, ?)",
+            (key, md.encode("utf-8"), int(time.time())),
+        )
+        conn.commit()
+        conn.close()
+    except sqlite3.Error as e:
+        logging.error(f"Error writing to response cache: {e}")
@@ -2,16 +2,38 @@ import os
 from dotenv import load_dotenv
 import logging
 import argparse
-import toml
+
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
 from meowdoc import core, mkdocs, llm
-import google.generativeai as genai
+
+# One-time setup guard so repeated in-process invocations (e.g. dev loops)
+# don't re-read .env every time.
+_INITED = False
+
+
+def _init_environment():
+    """Loads .env once per process.
+
+    Provider SDK setup happens inside the providers themselves, so this no
+    longer imports google.generativeai — an Ollama-only run doesn't pay the
+    gRPC/protobuf import cost. GeminiProvider configures the SDK with the
+    key from the configured key file."""
+    global _INITED
+    if _INITED:
+        return
+    load_dotenv()  # Load environment variables
+    _INITED = True
+
 
 def main():
     """Main function to run MeowDoc."""
 
     logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
-    load_dotenv()  # Load environment variables
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+    _init_environment()
 
     parser = argparse.ArgumentParser(description="Generate documentation using LLMs and MkDocs.")
     add_parser_args(parser)
@@ -52,6 +74,7 @@ def main():
         description,
         repo_url,
         llm_provider,
+        max_concurrency=config["llm"].get("concurrency", core.MAX_CONCURRENT_REQUESTS),
     )
 
     print("checking for existing mkdocs project...")
@@ -71,8 +94,10 @@ def main():
 
     if generated_files:
         is_input_dir = os.path.isdir(input_path)
-        mkdocs.update_mkdocs_nav(generated_files, page_relative_paths, is_input_dir, mkdocs_dir, docs_dir_name, project_name, description)
-        mkdocs.update_mkdocs_config_from_toml(config, mkdocs_dir)
+        # One parse and one write of mkdocs.yml for the whole pipeline.
+        with mkdocs.MkdocsConfig(mkdocs_dir) as cfg:
+            mkdocs.update_mkdocs_nav(generated_files, page_relative_paths, is_input_dir, mkdocs_dir, docs_dir_name, project_name, description, config_cache=cfg)
+            mkdocs.update_mkdocs_config_from_toml(config, mkdocs_dir, config_cache=cfg)
         print("All docs generated")
 
     logging.info("Finished.")
@@ -80,12 +105,12 @@ def main():
 def load_config(config_path):
     """Loads and validates the TOML configuration."""
     try:
-        with open(config_path, "r") as f:
-            config = toml.load(f)
+        with open(config_path, "rb") as f:
+            config = tomllib.load(f)
     except FileNotFoundError:
         logging.error(f"Configuration file not found: {config_path}")
         return None
-    except toml.TomlDecodeError as e:
+    except tomllib.TOMLDecodeError as e:
         logging.error(f"Error parsing TOML file: {e}")
         return None
 
@@ -121,7 +146,7 @@ def get_llm_provider(config):
     """Gets the LLM provider instance."""
     try:
         return llm.get_llm_provider(config)
-    except ValueError as e:
+    except (ValueError, ImportError) as e:
         logging.error(e)
         return None
 
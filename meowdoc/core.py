@@ -1,10 +1,115 @@
+import asyncio
+import functools
+import hashlib
+import json
 import os
 import logging
 import fnmatch
 import pathlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import shutil
 
+import aiofiles
+
+from meowdoc import cache, fastio
+
+# Upper bound on in-flight LLM requests, to stay within provider RPM limits.
+MAX_CONCURRENT_REQUESTS = 32
+
+# Extensions considered source code; everything else stays out of the context.
+DEFAULT_SOURCE_EXTS = {".py", ".js", ".ts", ".rs", ".go", ".md", ".toml", ".yaml"}
+
+# Files bigger than this are skipped rather than inflating every prompt.
+DEFAULT_MAX_FILE_BYTES = 64 * 1024
+
+# Bump whenever the prompt wording changes, so stale cached responses are not reused.
+PROMPT_TEMPLATE_VERSION = "1"
+
+# How many files to document per LLM request; amortizes the shared-context
+# prefill across the group.
+DEFAULT_BATCH_SIZE = 8
+
+# Classifies docguide pages in one match: 'foo.md' copies through, 'foo.ai.md'
+# is generated from its prompt. Both output 'foo.md'.
+PAGE_RE = re.compile(r'^(?P<stem>.+?)(?P<kind>\.ai)?\.md$')
+
+BATCH_PROMPT_HEADER = (
+    "Return ONLY a JSON object mapping each file's relative path to its complete"
+    " Markdown documentation, with no code fences around the JSON."
+    " Document each of the following files:\n\n"
+)
+
+PROMPT_HEADER = "Generate comprehensive documentation in Markdown format for the following Python file (do not give the Markdown in backticks.), considering the context of related files:\n\n"
+
+PROMPT_INSTRUCTIONS = """
+        Include:
+        *   A concise Module-level description.
+        *   Descriptions of functions and classes, including parameters, return values, and docstrings.
+        *   Clearly indicate how this file interacts with other modules (using examples).
+        *   Provide example usage.
+        *   Descriptions of each function and class, including parameters, return values, and docstrings.
+        *   Use clear headings and subheadings (e.g., ##, ###).
+        *   Provide example usage where possible.
+        *   If there are no docstrings, try to infer the purpose of the code based on its structure and variable names.
+        """
+
+
+@functools.lru_cache(maxsize=None)
+def _abs(path):
+    """Memoized os.path.abspath; the walk re-normalizes the same directories
+    over and over."""
+    return os.path.abspath(path)
+
+
+def _cache_keys_for(model_id, context_hash, items):
+    """Computes cache keys for a chunk of (rel, code) pairs.
+
+    Module-level and pure so ProcessPoolExecutor workers can run it; each
+    key covers the model, prompt template version, shared-context hash, and
+    the file's own source."""
+    return {
+        rel: hashlib.sha256(
+            (model_id + PROMPT_TEMPLATE_VERSION + context_hash + code).encode(
+                "utf-8"
+            )
+        ).hexdigest()
+        for rel, code in items
+    }
+
+
+def _write_file(path, text):
+    """Single-shot file write over a raw fd, skipping the buffered io stack
+    (one write syscall; nothing to flush on close)."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, text.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def _fast_copy(src, dst):
+    """Copies src to dst via os.copy_file_range when the platform has it
+    (in-kernel, and reflink/server-side on supporting filesystems), falling
+    back to shutil.copyfile."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(
+                        fsrc.fileno(), fdst.fileno(), remaining
+                    )
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                return
+        except OSError as e:
+            logging.debug(f"copy_file_range failed for {src}: {e}")
+    shutil.copyfile(src, dst)
+
+
 class MeowdocCore:
     """A class to generate documentation for Python files using LLM and MkDocs."""
 
@@ -18,6 +123,10 @@ class MeowdocCore:
         project_description,
         repo_url,
         llm_provider,
+        source_exts=None,
+        max_file_bytes=DEFAULT_MAX_FILE_BYTES,
+        batch_size=DEFAULT_BATCH_SIZE,
+        max_concurrency=MAX_CONCURRENT_REQUESTS,
 #         model="gemini-2.0-flash-exp",
     ):
         """Initialize the DocumentationGenerator with a specified AI model."""
@@ -29,131 +138,465 @@ class MeowdocCore:
         self.project_description=project_description
         self.repo_url=repo_url
         self.llm_provider = llm_provider
+        self.source_exts = source_exts if source_exts is not None else DEFAULT_SOURCE_EXTS
+        self.max_file_bytes = max_file_bytes
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
 #        self.model = model
+        # Compile the glob patterns into one alternation regex so matching a
+        # path component is a single C-level scan instead of a Python loop.
+        self._ignore_re = (
+            re.compile(
+                "|".join(f"(?:{fnmatch.translate(p)})" for p in ignore_patterns)
+            )
+            if ignore_patterns
+            else None
+        )
+        # Lazily-built map of docguide markdown, so prompt assembly does one
+        # walk of docguide/ instead of a stat per documented file.
+        self._docguides = None
         logging.basicConfig(
             level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
         )
 
-    def generate_docs(self, file_path, all_file_contents):
-        """Generates documentation for a single file with context from all related files."""
+    @staticmethod
+    def _file_block(filename, code):
+        """Formats one file's contents as a prompt context block."""
+        return f"File: {filename}\n```python\n{code}\n```\n\n"
+
+    @staticmethod
+    def _format_blocks(all_file_contents):
+        """Formats every file's context block exactly once, keyed by relative
+        path, so the context blob and the batch prompts share one copy."""
+        return {
+            filename: MeowdocCore._file_block(filename, code)
+            for filename, code in all_file_contents.items()
+        }
+
+    @staticmethod
+    def build_context_blob(all_file_contents):
+        """Serializes all file contents into one shared context blob, built
+        once per run instead of once per file."""
+        return "".join(MeowdocCore._format_blocks(all_file_contents).values())
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _system_prompt(full_context_blob):
+        """The immutable part (instructions + full repo context) goes first as
+        the system prompt so provider-side prefix caching can reuse its KV
+        state across all per-file calls; only the focus file moves.
+
+        Cached so every in-flight request shares one string object instead of
+        each holding its own O(repo-size) copy; with 32 concurrent requests
+        over a multi-MB context that bounds peak memory to a single copy."""
+        return "".join(
+            (
+                PROMPT_HEADER,
+                PROMPT_INSTRUCTIONS,
+                "\nFull repo context:\n\n",
+                full_context_blob,
+            )
+        )
+
+    def _build_prompts(self, file_path, all_file_contents, full_context_blob=None):
+        """Builds the (system_prompt, user_prompt) pair for a single file.
+
+        Returns None if the file's content is missing."""
         filename = os.path.basename(file_path)
         relative_filename = os.path.relpath(file_path, self.input_path) # Get the relative path
         filename = relative_filename
 
-        try:
-            code = all_file_contents[filename]
-        except KeyError:
-            logging.error(f"File content not found for {file_path}")
+        code = all_file_contents.get(filename)
+        if code is None:
+            logging.error("File content not found for %s", file_path)
             return None
-        finally:
-            logging.info(f"File content found for {file_path}")
 
-        prompt = "Generate comprehensive documentation in Markdown format for the following Python file (do not give the Markdown in backticks.), considering the context of related files:\n\n"
-        prompt += f"File: {filename}\n```python\n{code}\n```\n\n"
+        if full_context_blob is None:
+            full_context_blob = self.build_context_blob(all_file_contents)
 
-        prompt += "Context from related files:\n\n"
-        for other_filename, other_code in all_file_contents.items():
-            if other_filename != filename:
-                prompt += f"File: {other_filename}\n```python\n{other_code}\n```\n\n"
+        system_prompt = self._system_prompt(full_context_blob)
 
-        prompt += """
-        Include:
-        *   A concise Module-level description.
-        *   Descriptions of functions and classes, including parameters, return values, and docstrings.
-        *   Clearly indicate how this file interacts with other modules (using examples).
-        *   Provide example usage.
-        *   Descriptions of each function and class, including parameters, return values, and docstrings.
-        *   Use clear headings and subheadings (e.g., ##, ###).
-        *   Provide example usage where possible.
-        *   If there are no docstrings, try to infer the purpose of the code based on its structure and variable names.
-        """
+        # Build the prompt as a list of parts and join once; repeated `+=`
+        # re-copies every prior chunk and goes quadratic on large repos.
+        parts = [
+            f"Now generate the documentation for File: {filename}\n```python\n{code}\n```\n\n"
+        ]
 
-        # Read docguide content if it exists
-        docguide_path = os.path.join("docguide", file_path + ".md")
-        if os.path.exists(docguide_path):
+        # Append docguide content if it exists
+        guide_content = self._load_docguides().get(
+            os.path.join("docguide", file_path + ".md")
+        )
+        if guide_content is not None:
             logging.info(f"Docguide content found for {file_path}")
-            with open(docguide_path, "r", encoding="utf-8") as guide_file:
-                guide_content = guide_file.read()
-                # Append guide content to the prompt
-                prompt += f"\n\n### Additional Guidelines:\n{guide_content}\n"
+            parts.append(f"\n\n### Additional Guidelines:\n{guide_content}\n")
+
+        return system_prompt, "".join(parts)
+
+    def _load_docguides(self):
+        """Reads every docguide .md once and caches {path: content}.
+
+        One walk replaces the per-file os.path.exists stat that prompt
+        assembly used to pay."""
+        if self._docguides is None:
+            self._docguides = {}
+            for root, _, files in os.walk("docguide"):
+                for fname in files:
+                    if not fname.endswith(".md"):
+                        continue
+                    path = os.path.join(root, fname)
+                    try:
+                        with open(path, "r", encoding="utf-8") as guide_file:
+                            self._docguides[path] = guide_file.read()
+                    except OSError as e:
+                        logging.error(f"Error reading docguide {path}: {e}")
+        return self._docguides
+
+    def generate_docs(self, file_path, all_file_contents, full_context_blob=None):
+        """Generates documentation for a single file with context from all related files."""
+        prompts = self._build_prompts(file_path, all_file_contents, full_context_blob)
+        if prompts is None:
+            return None
+        system_prompt, prompt = prompts
 
         try:
-            # response = genai.GenerativeModel(model_name=self.model).generate_content(
-            #     prompt
-            # )
-            response = self.llm_provider.generate(prompt)
-            print(f"generated content for `{filename}`")
+            response = self.llm_provider.generate(prompt, system=system_prompt)
+            print(f"generated content for `{os.path.relpath(file_path, self.input_path)}`")
             return response
         except Exception as e:
             logging.exception(f"Error calling LLM: {e}")
             return None
 
-    def should_ignore(self, path, ignore_patterns):
-        """Checks if a path or any of its parent directories should be ignored."""
-        path = os.path.abspath(
-            path
-        )  # Convert to absolute path for consistent comparison
-        while path:
-            base_name = os.path.basename(path)
-            for pattern in ignore_patterns:
-                if fnmatch.fnmatch(base_name, pattern):
-                    # logging.info(
-                    #     f"Ignoring {path} because it matches pattern: {pattern}"
-                    # )
-                    return True
-            path = os.path.dirname(path)  # Move up to the parent directory
-            if path == os.path.dirname(path):  # Check for root
-                break
-        return False
+    async def generate_docs_async(
+        self, file_path, all_file_contents, full_context_blob=None
+    ):
+        """Async variant of generate_docs for the asyncio fan-out."""
+        prompts = self._build_prompts(file_path, all_file_contents, full_context_blob)
+        if prompts is None:
+            return None
+        system_prompt, prompt = prompts
+
+        try:
+            response = await self.llm_provider.agenerate(prompt, system=system_prompt)
+            print(f"generated content for `{os.path.relpath(file_path, self.input_path)}`")
+            return response
+        except Exception as e:
+            logging.exception(f"Error calling LLM: {e}")
+            return None
+
+    async def _compute_cache_keys(self, all_contents, context_hash):
+        """Hashes every file's cache key, fanned across a process pool.
+
+        Keying hashes each file's full source plus the shared context hash —
+        the one CPU-bound per-file stage left before network dispatch — so on
+        large repos it scales with cores instead of serializing on the event
+        loop. Falls back to inline hashing if the pool cannot start."""
+        model_id = getattr(self.llm_provider, "model", "")
+        items = list(all_contents.items())
+        workers = min(os.cpu_count() or 1, len(items))
+        if workers > 1:
+            try:
+                loop = asyncio.get_running_loop()
+                chunk = -(-len(items) // workers)
+                keys = {}
+                with ProcessPoolExecutor(max_workers=workers) as cpu_pool:
+                    parts = await asyncio.gather(*[
+                        loop.run_in_executor(
+                            cpu_pool,
+                            _cache_keys_for,
+                            model_id,
+                            context_hash,
+                            items[i:i + chunk],
+                        )
+                        for i in range(0, len(items), chunk)
+                    ])
+                for part in parts:
+                    keys.update(part)
+                return keys
+            except OSError as e:
+                logging.warning(f"Process pool unavailable, hashing inline: {e}")
+        return _cache_keys_for(model_id, context_hash, items)
+
+    async def _stream_docs_to_file(
+        self, file_path, all_file_contents, full_context_blob, out_path, cache_key=None
+    ):
+        """Streams generated docs straight into out_path instead of holding
+        the whole response in memory. Returns True if any content was written."""
+        prompts = self._build_prompts(file_path, all_file_contents, full_context_blob)
+        if prompts is None:
+            return False
+        system_prompt, prompt = prompts
+
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logging.info(f"Cache hit for {file_path}")
+                _write_file(out_path, cached)
+                return True
+
+        wrote_any = False
+        try:
+            async with aiofiles.open(out_path, 'w', encoding='utf-8') as out:
+                async for chunk in self.llm_provider.agenerate_stream(
+                    prompt, system=system_prompt
+                ):
+                    if chunk:
+                        await out.write(chunk)
+                        wrote_any = True
+        except Exception as e:
+            logging.exception(f"Error calling LLM: {e}")
+            # A truncated stream must not leave a partial page behind (and
+            # must never reach the cache below, which would permanently
+            # serve the corrupt output for unchanged source).
+            try:
+                os.remove(out_path)
+            except OSError:
+                pass
+            return False
+
+        # Only reached when the stream completed cleanly; safe to cache.
+        if wrote_any:
+            print(f"generated content for `{os.path.relpath(file_path, self.input_path)}`")
+            if cache_key is not None:
+                with open(out_path, 'r', encoding='utf-8') as out:
+                    cache.put(cache_key, out.read())
+        else:
+            # Don't leave an empty .md behind on a failed generation.
+            try:
+                os.remove(out_path)
+            except OSError:
+                pass
+        return wrote_any
+
+    def should_ignore(self, path, ignore_patterns=None):
+        """Checks if any component of the path matches an ignore pattern."""
+        if self._ignore_re is None:
+            return False
+        parts = _abs(path).split(os.sep)
+        return any(self._ignore_re.match(p) for p in parts if p)
+
+    def _is_source_file(self, fp):
+        """Cheap filters keeping binaries, giants, and generated docs out of
+        the context: extension whitelist, size cap, and a NUL-byte sniff."""
+        if os.path.splitext(fp)[1].lower() not in self.source_exts:
+            return False
+        try:
+            if os.stat(fp).st_size > self.max_file_bytes:
+                logging.info(f"Skipping oversized file: {fp}")
+                return False
+            with open(fp, 'rb') as f:
+                if b'\0' in f.read(4096):
+                    logging.info(f"Skipping binary file: {fp}")
+                    return False
+        except OSError as e:
+            logging.error(f"Failed statting {fp}: {e}")
+            return False
+        return True
 
     def _collect_files(self):
-        """Walk input_path and return list of (file_path, relative_path)."""
+        """Walk input_path and return list of (file_path, relative_path).
+
+        Uses os.scandir with an explicit stack instead of os.walk: the
+        DirEntry type info from the directory listing answers is_dir/is_file
+        without an extra stat per entry, and ignored subtrees are pruned
+        before they are ever listed."""
         file_list = []
-        for root, _, files in os.walk(self.input_path):
-            if self.should_ignore(root, self.ignore_patterns):
+        abs_mkdocs_dir = _abs(self.mkdocs_dir)
+        stack = [self.input_path]
+        while stack:
+            directory = stack.pop()
+            try:
+                it = os.scandir(directory)
+            except OSError as e:
+                logging.error(f"Error scanning {directory}: {e}")
                 continue
-            for fname in files:
-                fp = os.path.join(root, fname)
-                if self.should_ignore(fp, self.ignore_patterns):
-                    continue
-                rel = os.path.relpath(fp, self.input_path)
-                file_list.append((fp, rel))
+            with it:
+                for entry in it:
+                    if self._ignore_re is not None and self._ignore_re.match(
+                        entry.name
+                    ):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Never descend into the generated docs tree.
+                            if _abs(entry.path) != abs_mkdocs_dir:
+                                stack.append(entry.path)
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                    except OSError as e:
+                        logging.error(f"Error statting {entry.path}: {e}")
+                        continue
+                    if not self._is_source_file(entry.path):
+                        continue
+                    rel = os.path.relpath(entry.path, self.input_path)
+                    file_list.append((entry.path, rel))
         return file_list
 
-    def process_path(self):
-        """Concurrent version of the old process_path; returns list of generated docs."""
-        files = self._collect_files()
+    async def _read_all(self, files):
+        """Pre-reads all (file_path, relative_path) pairs into {rel: content}.
+
+        Uses the io_uring bulk path when available, otherwise concurrent
+        aiofiles reads so ingest is not serialized on one file at a time."""
         all_contents = {}
-        # Pre‑read all files into memory (so reading itself can be parallelized too)
-        for fp, rel in files:
+        if fastio.has_uring():
+            raw = fastio.bulk_read([fp for fp, _ in files])
+            for fp, rel in files:
+                data = raw.get(fp)
+                if data is None:
+                    continue
+                try:
+                    all_contents[rel] = data.decode('utf-8')
+                except UnicodeDecodeError as e:
+                    logging.error(f"Failed decoding {fp}: {e}")
+            return all_contents
+
+        async def _read(fp, rel):
             try:
-                with open(fp, 'r', encoding='utf-8') as f:
-                    all_contents[rel] = f.read()
+                async with aiofiles.open(fp, 'r', encoding='utf-8') as f:
+                    return rel, await f.read()
             except Exception as e:
                 logging.error(f"Failed reading {fp}: {e}")
+                return rel, None
+
+        for rel, content in await asyncio.gather(*[_read(fp, rel) for fp, rel in files]):
+            if content is not None:
+                all_contents[rel] = content
+        return all_contents
+
+    async def _generate_batch(self, group, blocks, full_context_blob):
+        """Documents a group of files in one LLM request.
+
+        `group` is a list of (fp, rel, out_path, cache_key) tuples and
+        `blocks` the preformatted context blocks from _format_blocks. Returns
+        (written_paths, fallback_items); files missing from the parsed JSON
+        response land in fallback_items for single-file retries."""
+        parts = [BATCH_PROMPT_HEADER]
+        parts.extend(blocks[rel] for _, rel, _, _ in group)
+        prompt = "".join(parts)
+        system_prompt = self._system_prompt(full_context_blob)
+
+        mapping = {}
+        try:
+            response = await self.llm_provider.agenerate(prompt, system=system_prompt)
+            # Tolerate fences or prose around the JSON object.
+            match = re.search(r"\{.*\}", response, re.DOTALL)
+            if match:
+                mapping = json.loads(match.group(0))
+        except Exception as e:
+            logging.exception(f"Error calling LLM for batch: {e}")
+
+        written = []
+        fallback = []
+        for fp, rel, out_path, key in group:
+            docs = mapping.get(rel)
+            if not isinstance(docs, str) or not docs:
+                fallback.append((fp, rel, out_path, key))
+                continue
+            _write_file(out_path, docs)
+            if key is not None:
+                cache.put(key, docs)
+            print(f"generated content for `{rel}`")
+            written.append(out_path)
+        if fallback:
+            logging.warning(
+                f"Batch response missing {len(fallback)} files; retrying them individually"
+            )
+        return written, fallback
+
+    def process_path(self):
+        """Concurrent version of the old process_path; returns list of generated docs."""
+        return asyncio.run(self._run_async())
+
+    async def _run_async(self):
+        """Drives doc generation for all collected files on one event loop."""
+        files = self._collect_files()
+        all_contents = await self._read_all(files)
 
         mkdocs_docs = os.path.join(self.mkdocs_dir, self.docs_dir)
         pathlib.Path(mkdocs_docs).mkdir(parents=True, exist_ok=True)
 
+        # Create every output directory up front; the writers below then skip
+        # the per-file mkdir round-trips into directories that already exist.
+        for out_dir in {
+            os.path.join(mkdocs_docs, os.path.dirname(rel)) for _, rel in files
+        }:
+            os.makedirs(out_dir, exist_ok=True)
+
+        # Format each file's context block once; the shared blob and every
+        # batch prompt reuse the same strings instead of re-running the
+        # f-string per prompt.
+        blocks = self._format_blocks(all_contents)
+        full_context_blob = "".join(blocks.values())
+        context_hash = hashlib.sha256(full_context_blob.encode("utf-8")).hexdigest()
+
+        # CPU stage (per-file cache-key hashing) runs before the network
+        # stage, parallelized across cores.
+        keys = await self._compute_cache_keys(all_contents, context_hash)
+
+        # One event-loop thread drives all in-flight requests; the semaphore
+        # keeps concurrency within provider rate limits.
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Resolve cache hits up front; only misses go over the network.
         results = []
-        # Use ThreadPoolExecutor for I/O-bound work
-        with ThreadPoolExecutor() as exe:
-            future_to_file = {
-                exe.submit(self.generate_docs, fp, all_contents): (fp, rel)
-                for fp, rel in files
-            }
-            for fut in as_completed(future_to_file):
-                fp, rel = future_to_file[fut]
-                docs = fut.result()
-                if docs:
-                    out_fname = os.path.splitext(os.path.basename(rel))[0] + '.md'
-                    out_path = os.path.join(mkdocs_docs, os.path.dirname(rel), out_fname)
-                    pathlib.Path(os.path.dirname(out_path)).mkdir(parents=True, exist_ok=True)
-                    with open(out_path, 'w', encoding='utf-8') as out:
-                        out.write(docs)
+        pending = []
+        for fp, rel in files:
+            # Collected files that failed to read or decode have no entry in
+            # all_contents/blocks; skip them instead of letting the batch
+            # prompt builder hit a missing key.
+            if rel not in all_contents:
+                logging.error(f"File content not found for {fp}; skipping")
+                continue
+            out_fname = os.path.splitext(os.path.basename(rel))[0] + '.md'
+            out_path = os.path.join(mkdocs_docs, os.path.dirname(rel), out_fname)
+            key = keys.get(rel)
+            cached = cache.get(key) if key is not None else None
+            if cached is not None:
+                logging.info(f"Cache hit for {fp}")
+                _write_file(out_path, cached)
+                results.append(out_path)
+            else:
+                pending.append((fp, rel, out_path, key))
+
+        # Group the misses so the shared-context prefill is amortized over
+        # batch_size files per request.
+        groups = [
+            pending[i:i + self.batch_size]
+            for i in range(0, len(pending), self.batch_size)
+        ]
+
+        async def bounded_batch(group):
+            async with semaphore:
+                return await self._generate_batch(
+                    group, blocks, full_context_blob
+                )
+
+        async def bounded_single(fp, rel, out_path, key):
+            async with semaphore:
+                wrote_any = await self._stream_docs_to_file(
+                    fp, all_contents, full_context_blob, out_path, key
+                )
+            return fp, out_path, wrote_any
+
+        try:
+            fallback_items = []
+            for fut in asyncio.as_completed([bounded_batch(g) for g in groups]):
+                written, fallback = await fut
+                results.extend(written)
+                fallback_items.extend(fallback)
+
+            for fut in asyncio.as_completed(
+                [bounded_single(*item) for item in fallback_items]
+            ):
+                fp, out_path, wrote_any = await fut
+                if wrote_any:
                     results.append(out_path)
                 else:
                     logging.error(f"No docs for {fp}")
+        finally:
+            # The provider keeps one HTTP connection pool alive for the whole
+            # run; close it with the loop that created it.
+            await self.llm_provider.aclose()
         return results
 
     def process_docguide_pages(self):
@@ -181,23 +624,16 @@ class MeowdocCore:
 
                  for fname in files:
                      input_filepath = os.path.join(root, fname)
-                     # Only process .md or .ai.md files
-                     if not (fname.endswith(".md") or fname.endswith(".ai.md")):
+                     # One regex match classifies the page and derives the
+                     # output name (previously three endswith/splitext passes,
+                     # with an '.ai' branch that could never fire).
+                     match = PAGE_RE.match(fname)
+                     if not match:
                          logging.debug(f"Skipping unsupported file in docguide/pages: {input_filepath}")
                          continue
 
-                     output_fname_base, ext = os.path.splitext(fname)
-                     # If it's .ai.md, output is .md; if it's .md, output is .md
-                     if ext == '.ai': # Handle .ai.md case specifically
-                         output_fname = output_fname_base # The base name is already the desired filename
-                         output_fname += ".md" # Add the .md extension
-
-                     elif ext == '.md' and not fname.endswith('.ai.md'): # Handle .md files that are not .ai.md
-                          output_fname = fname # Keep original filename
-
-                     else:
-                          logging.debug(f"Skipping file with unexpected extension in docguide/pages: {input_filepath}")
-                          continue
+                     use_ai = match.group('kind') is not None
+                     output_fname = match.group('stem') + '.md'
 
                      # Calculate the full output path within the docs directory
                      output_filepath = os.path.join(output_docs_dir_full, relative_to_pages_input, output_fname)
@@ -211,7 +647,7 @@ class MeowdocCore:
                          input_filepath,
                          output_filepath,
                          relative_output_path_for_nav,
-                         fname.endswith(".ai.md") # Flag to indicate if AI generation is needed
+                         use_ai
                      )] = input_filepath # Store input path for logging errors
 
              for fut in as_completed(future_to_filepath):
@@ -251,7 +687,7 @@ class MeowdocCore:
              else:
                  # Direct Markdown file - Copy
                  logging.info(f"Copying docguide page: {input_filepath} to {output_filepath}")
-                 shutil.copyfile(input_filepath, output_filepath)
+                 _fast_copy(input_filepath, output_filepath)
                  logging.info(f"Copied docguide page saved to: {output_filepath}")
                  return relative_output_path_for_nav # Return relative path on success
 
@@ -1,51 +1,322 @@
 from abc import ABC, abstractmethod
-import google.generativeai as genai
-import openai
+import asyncio
+import functools
+import hashlib
+import os
+import httpx
+import json
+import random
+import re
 import requests
+import time
 import logging
 
+# The Gemini and OpenAI SDKs are imported lazily inside their providers:
+# google.generativeai alone drags in gRPC and protobuf, and an Ollama-only
+# run (or `meowdoc --help`) shouldn't pay either SDK's import cost.
+
+from meowdoc import cache
+
+# Bounded retries keep a single transient 429/503 from silently producing
+# an empty doc page.
+MAX_RETRIES = 5
+
+
+def _transient(e):
+    """True when an error is worth retrying: rate limits, 5xx responses,
+    timeouts, and dropped connections. Error classes are matched by name so
+    no SDK has to be imported just for its exception types."""
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    if isinstance(
+        e,
+        (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            httpx.TransportError,
+        ),
+    ):
+        return True
+    return type(e).__name__ in (
+        "ResourceExhausted",
+        "TooManyRequests",
+        "ServiceUnavailable",
+        "InternalServerError",
+        "DeadlineExceeded",
+    )
+
+
+def _retry_delay(e, attempt):
+    """Seconds to wait before the next attempt; honors Retry-After when the
+    server sent one, otherwise exponential backoff with jitter."""
+    headers = getattr(getattr(e, "response", None), "headers", None)
+    if headers:
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    return min(60.0, 2.0 ** attempt) * (0.5 + random.random() / 2)
+
+
+def _with_retry(call, provider_name):
+    """Runs call() with backoff on transient errors; non-transient errors
+    and the final attempt propagate to the caller's error handling."""
+    for attempt in range(MAX_RETRIES):
+        try:
+            return call()
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1 or not _transient(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            logging.warning(
+                f"Transient {provider_name} error ({e}); retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+async def _with_retry_async(call, provider_name):
+    """Async twin of _with_retry."""
+    for attempt in range(MAX_RETRIES):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1 or not _transient(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            logging.warning(
+                f"Transient {provider_name} error ({e}); retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+# Header for marshaled (many files, one request) prompts.
+_MARSHAL_HEADER = (
+    "For each of the following files, produce documentation. Respond with"
+    " ONLY a JSON object mapping each file's id to its documentation, with"
+    " no code fences around the JSON.\n\n"
+)
+
+
+def _marshal_prompt(items):
+    """Builds one prompt documenting every (id, text) pair in items."""
+    parts = [_MARSHAL_HEADER]
+    parts.extend(f"=== file: {item_id} ===\n{text}\n\n" for item_id, text in items)
+    return "".join(parts)
+
+
+def _unmarshal(items, response):
+    """Maps a marshaled JSON response back to per-item results, in item
+    order; ids the model skipped (or an unparseable response) yield ""."""
+    mapping = {}
+    if response:
+        # Tolerate fences or prose around the JSON object.
+        match = re.search(r"\{.*\}", response, re.DOTALL)
+        if match:
+            try:
+                mapping = json.loads(match.group(0))
+            except json.JSONDecodeError as e:
+                logging.error(f"Could not parse marshaled response: {e}")
+    results = []
+    for item_id, _ in items:
+        value = mapping.get(item_id)
+        results.append(value if isinstance(value, str) else "")
+    return results
+
 class LLMProvider(ABC):
     """Base class for LLM providers."""
 
+    # Shared async HTTP client, created lazily; one connection pool serves
+    # every request in a run instead of a TLS handshake per call.
+    _aclient = None
+    _client_timeout = 120
+
+    def _client(self) -> httpx.AsyncClient:
+        """Returns the shared AsyncClient, creating it on first use."""
+        if self._aclient is None or self._aclient.is_closed:
+            self._aclient = httpx.AsyncClient(timeout=self._client_timeout)
+        return self._aclient
+
+    async def aclose(self):
+        """Closes the shared client; call once at the end of a run."""
+        if self._aclient is not None and not self._aclient.is_closed:
+            await self._aclient.aclose()
+
     @abstractmethod
-    def generate(self, prompt: str) -> str:
-        """Generate a response based on the prompt."""
+    def generate(self, prompt: str, system: str = None) -> str:
+        """Generate a response based on the prompt.
+
+        `system` carries the stable instructions/context prefix separately so
+        providers can send it in their system slot, which keeps the cacheable
+        part of the request identical across calls.
+        """
         pass
 
+    async def agenerate(self, prompt: str, system: str = None) -> str:
+        """Async variant of generate.
+
+        Providers with a plain-HTTP API override this with a real async
+        client; the default just runs the sync path in a worker thread so
+        every provider is awaitable.
+        """
+        return await asyncio.to_thread(self.generate, prompt, system)
+
+    async def agenerate_stream(self, prompt: str, system: str = None):
+        """Async generator yielding response chunks as they arrive.
+
+        Providers with a streaming API override this; the default yields the
+        whole agenerate result as a single chunk.
+        """
+        text = await self.agenerate(prompt, system)
+        if text:
+            yield text
+
+    def generate_marshaled(self, items, system: str = None) -> list:
+        """Documents several (id, text) pairs in one request.
+
+        Marshaling many small files into a single prompt amortizes the fixed
+        request overhead and spends one slot of the provider's rate limit
+        instead of len(items). Returns one result per item, in order, with
+        "" for ids the model skipped.
+        """
+        return _unmarshal(items, self.generate(_marshal_prompt(items), system))
+
+    async def agenerate_marshaled(self, items, system: str = None) -> list:
+        """Async variant of generate_marshaled."""
+        return _unmarshal(
+            items, await self.agenerate(_marshal_prompt(items), system)
+        )
+
 
 class GeminiProvider(LLMProvider):
     """LLM provider for Google Gemini."""
 
     def __init__(self, api_key: str, model: str):
+        try:
+            import google.generativeai as genai
+        except ImportError as e:
+            raise ImportError(
+                "google-generativeai is required for the Gemini provider;"
+                " install it with `pip install google-generativeai`."
+            ) from e
+        self._genai = genai
         self.api_key = api_key
         self.model = model
         genai.configure(api_key=self.api_key)
 
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, system: str = None) -> str:
+        def call():
+            model = self._genai.GenerativeModel(
+                model_name=self.model, system_instruction=system
+            )
+            return model.generate_content(prompt).text
+
         try:
-            response = genai.GenerativeModel(model_name=self.model).generate_content(prompt)
-            return response.text
+            return _with_retry(call, "Gemini")
         except Exception as e:
             logging.error(f"Error calling Gemini API: {e}")
             return ""
 
+    async def agenerate(self, prompt: str, system: str = None) -> str:
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        if system:
+            payload["system_instruction"] = {"parts": [{"text": system}]}
+
+        async def call():
+            response = await self._client().post(
+                "https://generativelanguage.googleapis.com/v1beta/models/"
+                f"{self.model}:generateContent",
+                params={"key": self.api_key},
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data["candidates"][0]["content"]["parts"][0]["text"]
+
+        try:
+            return await _with_retry_async(call, "Gemini")
+        except Exception as e:
+            logging.error(f"Error calling Gemini API: {e}")
+            return ""
+
+    async def agenerate_stream(self, prompt: str, system: str = None):
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        if system:
+            payload["system_instruction"] = {"parts": [{"text": system}]}
+        try:
+            async with self._client().stream(
+                "POST",
+                "https://generativelanguage.googleapis.com/v1beta/models/"
+                f"{self.model}:streamGenerateContent",
+                params={"key": self.api_key, "alt": "sse"},
+                json=payload,
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = json.loads(line[len("data: "):])
+                    try:
+                        yield data["candidates"][0]["content"]["parts"][0]["text"]
+                    except (KeyError, IndexError):
+                        continue
+        except Exception as e:
+            # Re-raise so the caller can tell a truncated stream from a
+            # completed one instead of keeping partial output as a success.
+            logging.error(f"Error calling Gemini API: {e}")
+            raise
+
 
 class OpenAiProvider(LLMProvider):
     """LLM provider for OpenAI."""
 
     def __init__(self, api_key: str, model: str):
+        try:
+            import openai
+        except ImportError as e:
+            raise ImportError(
+                "openai is required for the OpenAI provider;"
+                " install it with `pip install 'openai>=1.30'`."
+            ) from e
+        self._openai = openai
         self.api_key = api_key
         self.model = model
-        openai.api_key = self.api_key
+        self.client = openai.OpenAI(api_key=api_key, max_retries=2, timeout=60.0)
+        self._async_client = None
 
-    def generate(self, prompt: str) -> str:
+    @staticmethod
+    def _messages(prompt: str, system: str = None):
+        # The stable prefix goes in the system message, where OpenAI
+        # auto-caches long identical prefixes across calls.
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def generate(self, prompt: str, system: str = None) -> str:
         try:
-            response = openai.Completion.create(
+            response = self.client.chat.completions.create(
                 model=self.model,
-                prompt=prompt,
-                max_tokens=500
+                messages=self._messages(prompt, system),
             )
-            return response.choices[0].text.strip()
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logging.error(f"Error calling OpenAI API: {e}")
+            return ""
+
+    async def agenerate(self, prompt: str, system: str = None) -> str:
+        if self._async_client is None:
+            self._async_client = self._openai.AsyncOpenAI(
+                api_key=self.api_key, max_retries=2, timeout=60.0
+            )
+        try:
+            response = await self._async_client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(prompt, system),
+            )
+            return response.choices[0].message.content.strip()
         except Exception as e:
             logging.error(f"Error calling OpenAI API: {e}")
             return ""
@@ -54,29 +325,210 @@ class OpenAiProvider(LLMProvider):
 class OllamaProvider(LLMProvider):
     """LLM provider for Ollama (local LLM)."""
 
+    # Local generation can take minutes; never time the shared client out.
+    _client_timeout = None
+
     def __init__(self, base_url: str, model: str):
         self.base_url = base_url
         self.model = model
+        # Keep-alive session for the sync path: one pooled connection serves
+        # every generate call instead of a TCP handshake per prompt.
+        self.session = requests.Session()
+        self.session.mount(
+            self.base_url,
+            requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=16),
+        )
 
-    def generate(self, prompt: str) -> str:
+    def close(self):
+        """Closes the sync session's pooled connections."""
+        self.session.close()
+
+    def generate(self, prompt: str, system: str = None) -> str:
+        # Streaming instead of "stream": False means Ollama doesn't buffer
+        # the whole completion server-side before answering; tokens arrive
+        # as they are generated and are joined here.
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "num_ctx": 4096
-                    }
+            payload = {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "options": {
+                    "num_ctx": 4096
                 }
+            }
+            if system:
+                payload["system"] = system
+
+            def call():
+                response = self.session.post(
+                    f"{self.base_url}/api/generate",
+                    json=payload,
+                    stream=True,
+                    timeout=(5, 300)
+                )
+                response.raise_for_status()
+                parts = []
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    chunk = data.get("response", "")
+                    if chunk:
+                        parts.append(chunk)
+                    if data.get("done"):
+                        break
+                return "".join(parts)
+
+            return _with_retry(call, "Ollama")
+        except Exception as e:
+            logging.error(f"Error calling Ollama API: {e}")
+            return ""
+
+    async def agenerate(self, prompt: str, system: str = None) -> str:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "num_ctx": 4096
+            }
+        }
+        if system:
+            payload["system"] = system
+
+        async def call():
+            response = await self._client().post(
+                f"{self.base_url}/api/generate",
+                json=payload
             )
             response.raise_for_status()
             return response.json().get("response", "")
+
+        try:
+            return await _with_retry_async(call, "Ollama")
         except Exception as e:
             logging.error(f"Error calling Ollama API: {e}")
             return ""
 
+    async def agenerate_stream(self, prompt: str, system: str = None):
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "num_ctx": 4096
+            }
+        }
+        if system:
+            payload["system"] = system
+        try:
+            async with self._client().stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                json=payload
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    chunk = data.get("response", "")
+                    if chunk:
+                        yield chunk
+                    if data.get("done"):
+                        break
+        except Exception as e:
+            # Re-raise so the caller can tell a truncated stream from a
+            # completed one instead of keeping partial output as a success.
+            logging.error(f"Error calling Ollama API: {e}")
+            raise
+
+class CachingProvider(LLMProvider):
+    """Drop-in wrapper serving repeated prompts from the local response cache.
+
+    Re-running meowdoc over a lightly-changed repo re-issues mostly identical
+    prompts; an exact-match lookup keyed on the model and full prompt answers
+    those from sqlite in milliseconds instead of a paid network round-trip.
+    Opt in via `[llm.cache] enabled = true` in the config.
+    """
+
+    def __init__(self, inner: LLMProvider):
+        self.inner = inner
+        # Key lookups on the wrapped provider's model.
+        self.model = getattr(inner, "model", "")
+
+    def _key(self, prompt: str, system: str = None) -> str:
+        return hashlib.sha256(
+            f"{self.model}\x00{system or ''}\x00{prompt}".encode("utf-8")
+        ).hexdigest()
+
+    def generate(self, prompt: str, system: str = None) -> str:
+        key = self._key(prompt, system)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        response = self.inner.generate(prompt, system)
+        if response:
+            cache.put(key, response)
+        return response
+
+    async def agenerate(self, prompt: str, system: str = None) -> str:
+        key = self._key(prompt, system)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self.inner.agenerate(prompt, system)
+        if response:
+            cache.put(key, response)
+        return response
+
+    async def agenerate_stream(self, prompt: str, system: str = None):
+        key = self._key(prompt, system)
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        try:
+            async for chunk in self.inner.agenerate_stream(prompt, system):
+                chunks.append(chunk)
+                yield chunk
+        except BaseException:
+            # Mid-stream failure (or an early-closed consumer): drop the
+            # partial response rather than caching it for every later run.
+            chunks = None
+            raise
+        if chunks:
+            cache.put(key, "".join(chunks))
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+async def generate_batch(provider: LLMProvider, prompts, concurrency: int = 50):
+    """Fires a list of prompts at the provider concurrently.
+
+    Generation is I/O-bound, so the win comes from overlapping network
+    latency; the semaphore caps in-flight requests below provider rate
+    limits. Returns responses in prompt order.
+
+    Args:
+        provider (LLMProvider): The provider to call.
+        prompts: Iterable of prompt strings.
+        concurrency (int): Maximum simultaneous requests.
+
+    Returns:
+        list[str]: One response per prompt, in order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(prompt):
+        async with semaphore:
+            return await provider.agenerate(prompt)
+
+    return await asyncio.gather(*[bounded(p) for p in prompts])
+
+
 def get_llm_provider(config: dict) -> LLMProvider:
     """Initialize the LLM provider based on the configuration.
 
@@ -98,21 +550,30 @@ def get_llm_provider(config: dict) -> LLMProvider:
         if not api_key_file:
             raise ValueError("API key file path is required for Gemini.")
         api_key = read_api_key(api_key_file)
-        return GeminiProvider(api_key=api_key, model=model)
+        instance = GeminiProvider(api_key=api_key, model=model)
     elif provider == "openai":
         if not api_key_file:
             raise ValueError("API key file path is required for OpenAI.")
         api_key = read_api_key(api_key_file)
-        return OpenAiProvider(api_key=api_key, model=model)
+        instance = OpenAiProvider(api_key=api_key, model=model)
     elif provider == "ollama":
         if not base_url:
             raise ValueError("Base URL is required for Ollama.")
-        return OllamaProvider(base_url=base_url, model=model)
+        instance = OllamaProvider(base_url=base_url, model=model)
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
 
+    if config["llm"].get("cache", {}).get("enabled", False):
+        instance = CachingProvider(instance)
+    return instance
+
+@functools.lru_cache(maxsize=8)
+def _read_api_key(realpath):
+    with open(realpath) as f:
+        # strip() so a trailing newline in the key file can't break auth.
+        return f.read().strip()
+
 def read_api_key(path):
-    content = ""
-    with open(path) as f:
-        content = f.read()
-    return content
\ No newline at end of file
+    """Reads an API key file, cached so repeated provider setups in one
+    process don't re-hit the disk. Keyed on the canonical path."""
+    return _read_api_key(os.path.realpath(path))
\ No newline at end of file
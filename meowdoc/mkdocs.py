@@ -1,11 +1,104 @@
+import functools
+import hashlib
 import os
 import logging
 import yaml
-import subprocess
+from pathlib import Path
 from meowdoc import themes
-import json
 
-from pprint import pprint
+# Prefer the libyaml C bindings; pure-Python load/dump is an order of
+# magnitude slower on big nav trees.
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+class MkdocsConfig:
+    """Caches one parsed mkdocs.yml across the pipeline.
+
+    The nav update, toml merge, and finalize steps all touch the same file;
+    going through this context manager parses it once (reusing the cached
+    parse while the mtime is unchanged) and writes it back once on exit,
+    only if something was mutated.
+    """
+
+    # path -> (mtime, data, sha256), shared so repeated runs in one process
+    # reuse the parse when the file on disk hasn't moved.
+    _cache = {}
+
+    def __init__(self, mkdocs_dir):
+        self.mkdocs_dir = mkdocs_dir
+        self.path = os.path.join(mkdocs_dir, "mkdocs.yml")
+        self.data = None
+        self._dirty = False
+        self._disk_hash = None
+
+    def load(self):
+        """Parses mkdocs.yml, or returns None if it is missing/invalid."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            logging.error("mkdocs.yml not found. Please create a mkdocs project first.")
+            return None
+        cached = MkdocsConfig._cache.get(self.path)
+        if cached is not None and cached[0] == mtime:
+            self.data = cached[1]
+            self._disk_hash = cached[2]
+            return self.data
+        try:
+            with open(self.path, "r") as f:
+                text = f.read()
+            self.data = yaml.load(text, Loader=_YamlLoader) or {}
+        except (OSError, yaml.YAMLError) as e:
+            logging.error(f"Error parsing mkdocs.yml: {e}")
+            return None
+        self._disk_hash = hashlib.sha256(text.encode("utf-8")).digest()
+        MkdocsConfig._cache[self.path] = (mtime, self.data, self._disk_hash)
+        return self.data
+
+    def mark_dirty(self):
+        """Records that data was mutated and needs writing back."""
+        self._dirty = True
+
+    def save(self):
+        """Writes data back, but only when the serialized form changed."""
+        if not self._dirty or self.data is None:
+            return
+        try:
+            # sort_keys=False keeps the on-disk key order stable, so a
+            # run that only touches nav doesn't churn the whole file.
+            text = yaml.dump(
+                self.data,
+                Dumper=_YamlDumper,
+                indent=2,
+                sort_keys=False,
+                default_flow_style=False,
+            )
+            digest = hashlib.sha256(text.encode("utf-8")).digest()
+            if digest == self._disk_hash:
+                # No mtime bump for mkdocs serve / git to react to.
+                logging.info("mkdocs.yml unchanged, skipped write")
+                self._dirty = False
+                return
+            with open(self.path, "w") as f:
+                f.write(text)
+            self._disk_hash = digest
+            MkdocsConfig._cache[self.path] = (
+                os.path.getmtime(self.path), self.data, digest
+            )
+            self._dirty = False
+            logging.info("mkdocs.yml updated")
+        except Exception as e:
+            logging.error(f"Error writing to mkdocs.yml: {e}")
+
+    def __enter__(self):
+        self.load()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.save()
+
 
 def update_mkdocs_nav(
     generated_files,
@@ -16,18 +109,13 @@ def update_mkdocs_nav(
     name,
     description,
     theme="material",
+    config_cache=None,
 ):
-    mkdocs_config_path = os.path.join(mkdocs_dir, "mkdocs.yml")
-    logging.info(f"Updating mkdocs.yml: {mkdocs_config_path}")
+    cfg = config_cache if config_cache is not None else MkdocsConfig(mkdocs_dir)
+    logging.info(f"Updating mkdocs.yml: {cfg.path}")
 
-    try:
-        with open(mkdocs_config_path, "r") as f:
-            mkdocs_config = yaml.safe_load(f)
-    except FileNotFoundError:
-        logging.error("mkdocs.yml not found. Please create a mkdocs project first.")
-        return
-    except yaml.YAMLError as e:
-        logging.error(f"Error parsing mkdocs.yml: {e}")
+    mkdocs_config = cfg.data if cfg.data is not None else cfg.load()
+    if mkdocs_config is None:
         return
 
     if "nav" not in mkdocs_config:
@@ -35,7 +123,6 @@ def update_mkdocs_nav(
 
     mkdocs_config["site_name"] = name
     mkdocs_config["theme"] = {"name": themes.THEMES[theme]["mkdocs_name"]}
-    mkdocs_config["nav"] = []
     nav = mkdocs_config["nav"]
 
     if is_input_dir:
@@ -52,20 +139,34 @@ def update_mkdocs_nav(
         else:
             api_section = item["API"]
 
-        file_nav_structure = {}  # Dictionary to build nested nav
+        # Fold the existing API section back into the nested-dict form, then
+        # add this run's files on top: dict assignment is last-write-wins, so
+        # re-runs update entries in place instead of appending duplicates
+        # that a later dedupe pass has to strip.
+        file_nav_structure = _invert_nav(api_section, {})
 
-        for file in generated_files:
-            relative_path = os.path.relpath(file, os.path.join(mkdocs_dir, docs_dir_name))
-            parts = relative_path.split(os.sep)  # Split into path parts
-            filename = os.path.splitext(parts[-1])[0]  # Filename without extension
+        # Normalize the docs base once; generated files live under it by
+        # construction, so slicing off the prefix replaces a filesystem
+        # resolve plus relpath normalization per file. os.path.relpath stays
+        # as the fallback for anything that isn't a plain descendant.
+        base = os.path.normpath(os.path.join(mkdocs_dir, docs_dir_name))
+        prefix = base + os.sep
 
-            current_level = file_nav_structure
-            for part in parts[:-1]:  # Iterate through directory parts
-                if part not in current_level:
-                    current_level[part] = {}  # Create nested dict if needed
-                current_level = current_level[part]
+        for file in generated_files:
+            norm = os.path.normpath(file)
+            if norm.startswith(prefix):
+                relative_path = norm[len(prefix):]
+            else:
+                relative_path = os.path.relpath(file, base)
+            rel = Path(relative_path)
+            parts = rel.parts
 
-            current_level[filename] = relative_path # Add the file at the end
+            current_level = functools.reduce(
+                lambda level, part: level.setdefault(part, {}),
+                parts[:-1],
+                file_nav_structure,
+            )
+            current_level[rel.stem] = relative_path  # Add the file at the end
 
         # Convert the nested dictionary to a list of dictionaries for mkdocs
         def convert_to_mkdocs_nav(data):
@@ -77,7 +178,7 @@ def update_mkdocs_nav(
                     mkdocs_nav.append({key: value})
             return mkdocs_nav
 
-        api_section.extend(convert_to_mkdocs_nav(file_nav_structure)) # Extend the api section with the new structure
+        api_section[:] = convert_to_mkdocs_nav(file_nav_structure) # Rebuild the api section from the merged structure
 
     else:  # single file
         file = generated_files[0]
@@ -87,53 +188,66 @@ def update_mkdocs_nav(
         if nav_entry not in nav:
             nav.append(nav_entry)
 
-    nav_keys = list(map(lambda x: list(x.keys())[0], nav))
+    nav_keys = {next(iter(x)) for x in nav if isinstance(x, dict)}
     for item in page_relative_paths:
-        if item not in nav_keys:
-            nav.append({os.path.splitext(item)[0]: item})
+        page_name = os.path.splitext(item)[0]
+        if page_name not in nav_keys:
+            nav.append({page_name: item})
+            nav_keys.add(page_name)
     
-    try:
-        with open(mkdocs_config_path, "w") as f:
-            yaml.dump(mkdocs_config, f, indent=2)  # Use indent for better formatting
-        logging.info("mkdocs.yml updated")
-    except Exception as e:
-        logging.error(f"Error writing to mkdocs.yml: {e}")
+    cfg.mark_dirty()
+    if config_cache is None:
+        cfg.save()
 
     themes.enable_theme(theme)
 
 
 def create_mkdocs_project(project_dir, docs_dir_name):
-    """Creates a new MkDocs project if one doesn't exist."""
+    """Creates a new MkDocs project if one doesn't exist.
+
+    Writes the scaffold directly — the shape `mkdocs new` produces is three
+    known lines, so forking the subprocess and then re-parsing its output
+    just to inject the default nav was pure overhead."""
     mkdocs_config_path = os.path.join(project_dir, "mkdocs.yml")
-    if not os.path.exists(mkdocs_config_path):
-        logging.info(f"Creating new MkDocs project in: {project_dir}")
-        try:
-            subprocess.run(
-                ["mkdocs", "new", project_dir],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            # Add a default nav to the created mkdocs.yml
-            with open(mkdocs_config_path, "r") as f:
-                mkdocs_config = yaml.safe_load(f)
-            mkdocs_config["nav"] = [{"Home": "index.md"}]
-            with open(mkdocs_config_path, "w") as f:
-                yaml.dump(mkdocs_config, f)
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Failed to create MkDocs project: {e}")
-            logging.error(f"Stdout: {e.stdout}")
-            logging.error(f"Stderr: {e.stderr}")
-            return False
-        except Exception as e:
-            logging.exception(f"An unexpected error occurred: {e}")
-            return False
-        return True
-    else:
+    if os.path.exists(mkdocs_config_path):
         logging.info(f"MkDocs project already exists in: {project_dir}")
         return True
 
-    print("Created mkdocs project")
+    logging.info(f"Creating new MkDocs project in: {project_dir}")
+    try:
+        docs_dir = os.path.join(project_dir, docs_dir_name)
+        os.makedirs(docs_dir, exist_ok=True)
+        with open(mkdocs_config_path, "w") as f:
+            f.write(
+                "site_name: My Docs\n"
+                f"docs_dir: {docs_dir_name}\n"
+                "nav:\n"
+                "  - Home: index.md\n"
+            )
+        index_path = os.path.join(docs_dir, "index.md")
+        if not os.path.exists(index_path):
+            with open(index_path, "w") as f:
+                f.write(
+                    "# Welcome to MkDocs\n\n"
+                    "For full documentation visit [mkdocs.org](https://www.mkdocs.org).\n"
+                )
+    except OSError as e:
+        logging.error(f"Failed to create MkDocs project: {e}")
+        return False
+    return True
+
+def _invert_nav(entries, structure):
+    """Inverse of convert_to_mkdocs_nav: folds a nav list back into the
+    nested-dict form so merging is one linear walk with dict semantics."""
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        for key, value in entry.items():
+            if isinstance(value, list):
+                _invert_nav(value, structure.setdefault(key, {}))
+            else:
+                structure[key] = value
+    return structure
 
 def merge_dicts(existing, new):
     """
@@ -148,56 +262,64 @@ def merge_dicts(existing, new):
     return existing
 
 def finalize(mkdocs_config):
+    """Dedupes the in-memory nav in one pass before the single dump; nothing
+    here re-parses or re-serializes YAML."""
     if mkdocs_config.get("nav") is None:
         return mkdocs_config
     matches = list(map(_dedupe_API_elem, mkdocs_config["nav"]))
     mkdocs_config["nav"] = matches
     return mkdocs_config
 
+def _freeze(value):
+    """Returns a hashable form of a nav value: nested dicts/lists become
+    sorted tuples. Cheaper than JSON-serializing every entry just to get a
+    set key, and order-insensitive for dicts all the same."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
 def _dedupe_API_elem(elem):
-    if elem.get("API") is not None:        
-        data = elem["API"]
-        # pprint(data)
-        seen_json = set()
+    """Dedupes every list-valued section of a nav entry, recursively, so
+    repeated runs that re-append the same subtree collapse to one copy at
+    every nesting level (not just under the top-level API section)."""
+    if not isinstance(elem, dict):
+        return elem
+    for section, data in elem.items():
+        if not isinstance(data, list):
+            continue
+        seen = set()
         deduplicated_data = []
 
         for d in data:
-            # Convert the dictionary to a JSON string with sorted keys
-            # sort_keys=True is essential to ensure consistent string representation
-            # for dictionaries with the same content but different key order.
-            d_json = json.dumps(d, sort_keys=True)
-
-            if d_json not in seen_json:
-                seen_json.add(d_json)
-                deduplicated_data.append(d) # Append the original dictionary
+            key = _freeze(d)
+            if key not in seen:
+                seen.add(key)
+                deduplicated_data.append(
+                    _dedupe_API_elem(d) if isinstance(d, dict) else d
+                )
 
-        elem["API"] = deduplicated_data
-        # pprint(deduplicated_data)
+        elem[section] = deduplicated_data
     return elem
 
-def update_mkdocs_config_from_toml(config, mkdocs_dir):
+def update_mkdocs_config_from_toml(config, mkdocs_dir, config_cache=None):
     mkdocs_settings = config.get("mkdocs", {})  # Get the mkdocs section
 
-    mkdocs_config_path = os.path.join(mkdocs_dir, "mkdocs.yml")
-    logging.info(f"Updating mkdocs.yml: {mkdocs_config_path}")
+    cfg = config_cache if config_cache is not None else MkdocsConfig(mkdocs_dir)
+    logging.info(f"Updating mkdocs.yml: {cfg.path}")
 
-    try:
-        with open(mkdocs_config_path, "r") as f:
-            mkdocs_config = yaml.safe_load(f) or {}
-    except FileNotFoundError:
-        logging.error("mkdocs.yml not found. Please create a mkdocs project first.")
-        return
-    except yaml.YAMLError as e:
-        logging.error(f"Error parsing mkdocs.yml: {e}")
+    mkdocs_config = cfg.data if cfg.data is not None else cfg.load()
+    if mkdocs_config is None:
         return
 
-    # Merge mkdocs.yml with settings from config.toml
+    # Merge mkdocs.yml with settings from config.toml. The nav producer
+    # merges without duplicates by construction; finalize stays as a cheap
+    # in-memory safety net for navs edited outside meowdoc.
     mkdocs_config = merge_dicts(mkdocs_config, mkdocs_settings)
     mkdocs_config = finalize(mkdocs_config)
 
-    try:
-        with open(mkdocs_config_path, "w") as f:
-            yaml.dump(mkdocs_config, f, indent=2)
-        logging.info("mkdocs.yml updated with settings from config.toml")
-    except Exception as e:
-        logging.error(f"Error writing to mkdocs.yml: {e}")
\ No newline at end of file
+    cfg.data = mkdocs_config
+    cfg.mark_dirty()
+    if config_cache is None:
+        cfg.save()
\ No newline at end of file
@@ -5,11 +5,18 @@ setup(
     version="0.1.0",  # Replace with actual version
     packages=find_packages(),  # Automatically find packages
     install_requires=[
-        "google-generativeai",
         "mkdocs",
         "python-dotenv",
         "mkdocs-material",
+        "PyYAML",
+        "aiofiles",
+        "httpx",
+        "requests",
     ],
+    extras_require={
+        "gemini": ["google-generativeai"],
+        "openai": ["openai>=1.30"],
+    },
     entry_points={
         "console_scripts": [
             "meowdoc = cli:main",  # Replace cli:main with your actual entry point